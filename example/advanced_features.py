@@ -7,14 +7,27 @@ from logbolt import (
 )
 from typing import Dict, Any
 
+# 优先使用orjson（C实现，更快），不可用时回退到标准库json
+try:
+    import orjson
+    _HAS_ORJSON = True
+except ImportError:
+    import json
+    _HAS_ORJSON = False
+
 # 自定义过滤器：按关键字过滤
 class KeywordFilter(Filter):
     def __init__(self, keywords: list):
         self.keywords = keywords
+        # 关键字预先转小写；str的in查找在C层用bloom掩码跳过不可能匹配的位置
+        self._lowered = tuple(kw.lower() for kw in keywords)
     
     def filter(self, record: Dict[str, Any]) -> bool:
         msg = record.get('message', '').lower()
-        return not any(kw in msg for kw in self.keywords)
+        for kw in self._lowered:
+            if kw in msg:
+                return False
+        return True
 
 # 创建Logger
 logger = LogBolt("advanced")
@@ -56,16 +69,19 @@ logger.warning("警告信息会显示")
 
 print("\n=== 测试3: 结构化日志输出 ===")
 # 4. 结构化日志输出
+_JSON_EXCLUDED = frozenset(('timestamp', 'level', 'message'))
+_LEVEL_NAMES = {level.value: level.name for level in LogLevel}
+
 class JsonFormatter(CompiledFormatter):
     def format(self, record: Dict[str, Any]) -> str:
-        import json
         data = {
             "timestamp": record['timestamp'],
-            "level": LogLevel(record['level']).name,
+            "level": _LEVEL_NAMES[record['level']],
             "message": record['message'],
-            **{k: v for k, v in record.items() if k not in 
-               ['timestamp', 'level', 'message', '_handlers']}
+            **{k: v for k, v in record.items() if k not in _JSON_EXCLUDED}
         }
+        if _HAS_ORJSON:
+            return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
         return json.dumps(data, ensure_ascii=False)
 
 console.set_formatter(JsonFormatter())
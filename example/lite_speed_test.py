@@ -4,9 +4,11 @@ LogBolt Lite 性能测试
 对比标准版本和Lite版本的性能差异
 """
 
+import gc
 import time
 import sys
 import os
+from contextlib import contextmanager
 
 # 添加路径
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
@@ -14,6 +16,16 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 from logbolt import LogBolt, LogLevel, CompiledFormatter, FileHandler
 from logbolt.lite import UltraFastLogger, BatchLogger, log_fast, DEBUG, INFO
 
+@contextmanager
+def _gc_paused():
+    """计时区内暂停分代GC，避免回收停顿混入测量结果"""
+    gc.collect()
+    gc.disable()
+    try:
+        yield
+    finally:
+        gc.enable()
+
 def test_standard_logger():
     """测试标准logger性能"""
     print("=== 测试标准LogBolt性能 ===")
@@ -30,15 +42,19 @@ def test_standard_logger():
     for i in range(1000):
         logger.info(f"预热消息 {i}")
     
-    # 正式测试
-    start_time = time.perf_counter()
+    # 消息在计时区外预先构建，只测量日志器本身的开销
     message_count = 100000
+    messages = [f"这是测试消息 {i}" for i in range(message_count)]
     
-    for i in range(message_count):
-        logger.info(f"这是测试消息 {i}")
-    
-    logger.close()
-    end_time = time.perf_counter()
+    # 正式测试
+    with _gc_paused():
+        start_time = time.perf_counter()
+        
+        for msg in messages:
+            logger.info(msg)
+        
+        logger.close()
+        end_time = time.perf_counter()
     
     duration = end_time - start_time
     rate = message_count / duration
@@ -61,16 +77,20 @@ def test_lite_logger():
         logger.log_prealloc(INFO, f"预热消息 {i}".encode())
     logger.flush()
     
-    # 正式测试
-    start_time = time.perf_counter()
+    # 消息在计时区外预先编码
     message_count = 100000
+    messages = [f"这是测试消息 {i}".encode() for i in range(message_count)]
     
-    for i in range(message_count):
-        logger.log_prealloc(INFO, f"这是测试消息 {i}".encode())
-    
-    logger.flush()
-    logger.close()
-    end_time = time.perf_counter()
+    # 正式测试
+    with _gc_paused():
+        start_time = time.perf_counter()
+        
+        for msg in messages:
+            logger.log_prealloc(INFO, msg)
+        
+        logger.flush()
+        logger.close()
+        end_time = time.perf_counter()
     
     duration = end_time - start_time
     rate = message_count / duration
@@ -88,16 +108,20 @@ def test_batch_logger():
     logger = UltraFastLogger(b'batch', INFO, b'test_batch.log')
     batch = BatchLogger(logger)
     
-    # 正式测试
-    start_time = time.perf_counter()
+    # 消息在计时区外预先编码
     message_count = 100000
+    messages = [f"这是测试消息 {i}".encode() for i in range(message_count)]
     
-    for i in range(message_count):
-        batch.add_log(INFO, f"这是测试消息 {i}".encode())
-    
-    batch.flush()
-    logger.close()
-    end_time = time.perf_counter()
+    # 正式测试
+    with _gc_paused():
+        start_time = time.perf_counter()
+        
+        for msg in messages:
+            batch.add_log(INFO, msg)
+        
+        batch.flush()
+        logger.close()
+        end_time = time.perf_counter()
     
     duration = end_time - start_time
     rate = message_count / duration
@@ -114,23 +138,20 @@ def test_raw_logger():
     
     logger = UltraFastLogger(b'raw', INFO, b'test_raw.log')
     
-    # 预格式化消息
-    messages = []
-    for i in range(100000):
-        timestamp = f"2024-01-01 12:00:00"
-        msg = f"这是测试消息 {i}".encode()
-        formatted = f"{timestamp} [INFO] ".encode() + msg + b'\n'
-        messages.append(formatted)
+    # 预格式化消息 - 固定前缀只编码一次
+    prefix = b"2024-01-01 12:00:00 [INFO] "
+    messages = [prefix + f"这是测试消息 {i}".encode() + b'\n' for i in range(100000)]
     
     # 正式测试
-    start_time = time.perf_counter()
-    message_count = len(messages)
-    
-    for msg in messages:
-        logger.log_raw(INFO, msg)
-    
-    logger.close()
-    end_time = time.perf_counter()
+    with _gc_paused():
+        start_time = time.perf_counter()
+        message_count = len(messages)
+        
+        for msg in messages:
+            logger.log_raw(INFO, msg)
+        
+        logger.close()
+        end_time = time.perf_counter()
     
     duration = end_time - start_time
     rate = message_count / duration
@@ -2,12 +2,15 @@
 """
 LogBolt核心模块 - 高性能日志库
 """
+import io
 import os
 import sys
 import time
 import threading
-import contextlib
-import queue
+import functools
+import itertools
+from collections import deque
+from collections.abc import Mapping
 from enum import IntEnum
 from typing import Optional, Dict, Any, List, Union, Protocol, Callable
 from datetime import datetime
@@ -30,6 +33,46 @@ class LogLevel(IntEnum):
     CRITICAL = 50
 
 
+# 级别数值 -> 名称，避免每条记录都构造枚举成员
+_LEVEL_NAMES: Dict[int, str] = {level.value: level.name for level in LogLevel}
+
+# 进程ID缓存：getpid在部分平台上是一次系统调用，fork后在子进程中刷新
+_PID = os.getpid()
+
+
+def _refresh_pid() -> None:
+    global _PID
+    _PID = os.getpid()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_refresh_pid)
+
+# FileHandler的写缓冲大小：一批日志通常只需一次write系统调用
+_FILE_BUFFER_SIZE = 256 * 1024
+
+# 000~999 的三位数字字符串，用于无需strftime地拼出 %f（微秒）
+_DIGITS3 = tuple(f'{i:03d}' for i in range(1000))
+
+
+def _split_datefmt(datefmt: str) -> Optional[tuple]:
+    """在唯一的 %f 处把datefmt拆成前后两段；没有或有多个 %f 时返回None"""
+    pos = -1
+    i = 0
+    while i < len(datefmt):
+        if datefmt[i] == '%' and i + 1 < len(datefmt):
+            if datefmt[i + 1] == 'f':
+                if pos >= 0:
+                    return None
+                pos = i
+            i += 2
+        else:
+            i += 1
+    if pos < 0:
+        return None
+    return datefmt[:pos], datefmt[pos + 2:]
+
+
 class LogFormatter:
     """基础日志格式化器"""
     
@@ -41,54 +84,138 @@ class LogFormatter:
         self._style = "{"
     
     def format(self, record: Dict[str, Any]) -> str:
-        """将日志记录格式化为字符串"""
-        record = record.copy()
-        record['asctime'] = datetime.fromtimestamp(record['timestamp'] / 1e9).strftime(self.datefmt)
-        record['levelname'] = LogLevel(record['level']).name
-        return self.fmt.format(**record)
+        """将日志记录格式化为字符串（不修改传入的记录）"""
+        return self.fmt.format_map({
+            **record,
+            'asctime': datetime.fromtimestamp(record['timestamp'] / 1e9).strftime(self.datefmt),
+            'levelname': _LEVEL_NAMES[record['level']],
+        })
 
 
 class CompiledFormatter(LogFormatter):
     """预编译高性能格式化器 - 采用直接模板替换"""
     
-    __slots__ = ('_format_func', '_field_getters')
+    __slots__ = ('_format_func', '_field_getters', '_time_cache', '_tid_cache',
+                 '_date_parts')
     
     def __init__(self, fmt: Optional[str] = None, datefmt: Optional[str] = None):
         self.datefmt = datefmt or "%Y-%m-%d %H:%M:%S"
+        self._time_cache = (-1, '', '')
+        self._tid_cache: Dict[Any, str] = {}
+        self._date_parts = _split_datefmt(self.datefmt)
+        if '%f' not in self.datefmt:
+            asctime = self._format_time
+        elif self._date_parts is not None:
+            asctime = self._format_time_us
+        else:
+            asctime = lambda r: datetime.fromtimestamp(r['timestamp'] / 1e9).strftime(self.datefmt)
+        # 需要缓存的字段才有取值函数；levelname/message等由_field_source直接内联
         self._field_getters = {
-            'asctime': lambda r: datetime.fromtimestamp(r['timestamp'] / 1e9).strftime(self.datefmt),
-            'levelname': lambda r: LogLevel(r['level']).name,
-            'message': lambda r: r.get('message', ''),
-            'name': lambda r: r.get('name', ''),
-            'thread_id': lambda r: str(r.get('thread_id', '')),
-            'process_id': lambda r: str(r.get('process_id', '')),
+            'asctime': asctime,
+            'thread_id': self._format_thread_id,
         }
         self._format_func = self._compile(fmt or "{asctime} - {levelname} - {message}")
     
     def _compile(self, fmt: str) -> Callable[[Dict[str, Any]], str]:
-        """终极修复：手动解析模板，避免eval作用域问题"""
+        """把模板生成为一个专用函数：常量原样内联，字段直接从记录取值，一个f-string完成拼接"""
         import string
-        field_names = []
-        formatter = string.Formatter()
+        parsed = list(string.Formatter().parse(fmt))
         
-        for _, field_name, _, _ in formatter.parse(fmt):
-            if field_name:
-                field_names.append(field_name)
+        # 转换符会原样拼进生成的源码，先按str.format的规则校验
+        for _, field, _, conversion in parsed:
+            if field is not None and conversion not in (None, 'r', 's', 'a'):
+                raise ValueError(f"Unknown conversion specifier {conversion}")
         
-        def format_record(record: Dict[str, Any]) -> str:
-            values = {}
-            for field in field_names:
-                if field in self._field_getters:
-                    values[field] = self._field_getters[field](record)
-                else:
-                    values[field] = str(record.get(field, ''))
-            
-            try:
-                return fmt.format(**values)
-            except KeyError:
-                return LogFormatter(fmt, self.datefmt).format(record)
+        # 位置参数、属性/下标访问等复杂字段交给通用格式化器处理
+        if any(field is not None and (not field.isidentifier() or '{' in (spec or ''))
+               for _, field, spec, _ in parsed):
+            return LogFormatter(fmt, self.datefmt).format
+        
+        namespace: Dict[str, Any] = {}
+        parts = []
+        for literal, field, spec, conversion in parsed:
+            if literal:
+                # repr得到合法的字符串字面量，再转义花括号作为f-string的常量部分
+                parts.append('f' + repr(literal).replace('{', '{{').replace('}', '}}'))
+            if field is not None:
+                parts.append('f"{' + self._field_source(field, spec, conversion, namespace) + '}"')
+        
+        if not parts:
+            return lambda record: ''
+        
+        source = 'def format_record(r):\n    return (' + ' '.join(parts) + ')\n'
+        exec(compile(source, f'<CompiledFormatter {fmt!r}>', 'exec'), namespace)
+        return namespace['format_record']
+    
+    def _field_source(self, field: str, spec: str, conversion: Optional[str],
+                      namespace: Dict[str, Any]) -> str:
+        """生成单个字段在f-string中的表达式；需要的对象以 _nN 的名字放进namespace"""
+        def bind(value: Any) -> str:
+            name = f'_n{len(namespace)}'
+            namespace[name] = value
+            return name
+        
+        # 级别名称只有五种，提前按转换符和格式说明处理好
+        if field == 'levelname':
+            convert = {'r': repr, 's': str, 'a': ascii}.get(conversion)
+            names = {}
+            for value, name in _LEVEL_NAMES.items():
+                if convert is not None:
+                    name = convert(name)
+                names[value] = format(name, spec)
+            return f"{bind(names)}[r['level']]"
+        
+        # asctime/thread_id调用各自的（带缓存的）取值函数，其余字段直接内联取值
+        getter = self._field_getters.get(field)
         
-        return format_record
+        if getter is not None:
+            # 取值函数返回的已经是str
+            expr = f'{bind(getter)}(r)'
+        else:
+            expr = f'r.get({field!r}, {"" !r})'
+            if spec or conversion:
+                # 与str.format(**values)一致：转换符和格式说明作用于字段的str形式
+                expr = f'str({expr})'
+        
+        if conversion:
+            expr += '!' + conversion
+        if spec:
+            expr += ':{' + bind(spec) + '}'
+        return expr
+    
+    def _format_time(self, record: Dict[str, Any]) -> str:
+        """按秒缓存asctime - 同一秒内的记录复用已格式化的字符串"""
+        sec = record['timestamp'] // 1_000_000_000
+        cached = self._time_cache
+        if sec == cached[0]:
+            return cached[1]
+        asctime = datetime.fromtimestamp(sec).strftime(self.datefmt)
+        self._time_cache = (sec, asctime, '')
+        return asctime
+    
+    def _format_time_us(self, record: Dict[str, Any]) -> str:
+        """datefmt含 %f 时：按秒缓存 %f 两侧的部分，微秒由查表拼出"""
+        ts = record['timestamp']
+        sec = ts // 1_000_000_000
+        cached = self._time_cache
+        if sec != cached[0]:
+            dt = datetime.fromtimestamp(sec)
+            head, tail = self._date_parts
+            cached = (sec, dt.strftime(head), dt.strftime(tail))
+            self._time_cache = cached
+        us = ts // 1000 % 1_000_000
+        return cached[1] + _DIGITS3[us // 1000] + _DIGITS3[us % 1000] + cached[2]
+    
+    def _format_thread_id(self, record: Dict[str, Any]) -> str:
+        """缓存线程ID的字符串形式 - 线程数量有限，每个ID只转换一次"""
+        tid = record.get('thread_id', '')
+        cache = self._tid_cache
+        tid_str = cache.get(tid)
+        if tid_str is None:
+            if len(cache) >= 1024:  # 线程频繁创建销毁时防止无限增长
+                cache.clear()
+            tid_str = cache[tid] = str(tid)
+        return tid_str
     
     def format(self, record: Dict[str, Any]) -> str:
         return self._format_func(record)
@@ -102,32 +229,52 @@ class Filter(Protocol):
 class SamplingFilter:
     """采样过滤器 - 防止日志风暴"""
     
-    __slots__ = ('rate', '_counter')
+    __slots__ = ('rate', '_counter', '_next', '_mask')
     
     def __init__(self, rate: int = 100):
         self.rate = rate
         if _HAS_ATOMICS:
             self._counter = atomics.atomic(width=4, atype=atomics.UINT)
+            self._next = functools.partial(self._counter.fetch_add, 1)
         else:
-            self._counter = 0
+            # itertools.count的next()在GIL下不可分割，多线程计数不会丢失
+            self._counter = itertools.count()
+            self._next = self._counter.__next__
+        # rate为2的幂时用位与代替取模
+        self._mask = rate - 1 if rate > 0 and rate & (rate - 1) == 0 else None
     
     def filter(self, record: Dict[str, Any]) -> bool:
-        if _HAS_ATOMICS:
-            return self._counter.fetch_add(1) % self.rate == 0
-        else:
-            self._counter += 1
-            return self._counter % self.rate == 0
+        count = self._next()
+        mask = self._mask
+        if mask is not None:
+            return count & mask == 0
+        return count % self.rate == 0
+
+
+# 处理器级别版本号：任一处理器修改level时递增，LogBolt据此判断缓存的处理器级别是否过期
+_handler_epochs = itertools.count(1)
+_handler_epoch = 0
 
 
 class LogHandler:
     """基础日志处理器"""
     
-    __slots__ = ('level', 'formatter')
+    __slots__ = ('_level', 'formatter')
     
     def __init__(self, level: LogLevel = LogLevel.INFO):
         self.level = level
         self.formatter = CompiledFormatter()
     
+    @property
+    def level(self) -> LogLevel:
+        return self._level
+    
+    @level.setter
+    def level(self, level: LogLevel) -> None:
+        global _handler_epoch
+        self._level = level
+        _handler_epoch = next(_handler_epochs)
+    
     def set_formatter(self, formatter: Union[LogFormatter, CompiledFormatter]):
         """设置自定义格式化器"""
         self.formatter = formatter
@@ -145,40 +292,45 @@ class LogHandler:
         """批量写入 - 默认实现"""
         for msg in messages:
             self.emit({'message': msg})
+    
+    def flush(self) -> None:
+        """将缓冲的数据写出 - 调度器在每批日志结束时调用，默认无操作"""
 
 
 class ConsoleHandler(LogHandler):
     """控制台输出处理器 - 线程安全"""
     
-    __slots__ = ('stream', '_lock')
+    __slots__ = ('stream', '_lock', '_binary')
     
     def __init__(self, level: LogLevel = LogLevel.INFO, stream=None):
         super().__init__(level)
         self.stream = stream or sys.stdout
         self._lock = threading.Lock()
+        # 二进制流（如 open(..., 'wb')）直接写入UTF-8字节，跳过文本层
+        self._binary = isinstance(self.stream, (io.RawIOBase, io.BufferedIOBase))
+    
+    def _write(self, data: str) -> None:
+        """写入并刷新流"""
+        if self._binary:
+            data = data.encode('utf-8')
+        with self._lock:
+            self.stream.write(data)
+            self.stream.flush()
     
     def emit(self, record: Dict[str, Any]) -> None:
         """修复：直接输出，避免重复格式化"""
         try:
             if 'message' in record and isinstance(record['message'], str):
-                with self._lock:
-                    self.stream.write(record['message'] + '\n')
-                    self.stream.flush()
+                self._write(record['message'] + '\n')
             else:
-                msg = self.formatter.format(record)
-                with self._lock:
-                    self.stream.write(msg + '\n')
-                    self.stream.flush()
+                self._write(self.formatter.format(record) + '\n')
         except Exception as e:
             print(f"ConsoleHandler写入失败: {e}", file=sys.stderr)
     
     def _emit_batch(self, messages: List[str]):
         """批量写入控制台"""
         try:
-            data = '\n'.join(messages) + '\n'
-            with self._lock:
-                self.stream.write(data)
-                self.stream.flush()
+            self._write('\n'.join(messages) + '\n')
         except Exception as e:
             print(f"ConsoleHandler批量写入失败: {e}", file=sys.stderr)
 
@@ -186,7 +338,8 @@ class ConsoleHandler(LogHandler):
 class FileHandler(LogHandler):
     """高性能文件日志处理器 - 支持轮转"""
     
-    __slots__ = ('filename', 'max_bytes', 'backup_count', '_file', '_lock')
+    __slots__ = ('filename', 'max_bytes', 'backup_count', '_file', '_lock',
+                 '_bytes_written')
     
     def __init__(self, filename: str, level: LogLevel = LogLevel.INFO,
                  max_bytes: int = 10*1024*1024, backup_count: int = 5):
@@ -196,6 +349,7 @@ class FileHandler(LogHandler):
         self.backup_count = backup_count
         self._file = None
         self._lock = threading.Lock()
+        self._bytes_written = 0
         self._open_file()
     
     def _open_file(self):
@@ -205,19 +359,22 @@ class FileHandler(LogHandler):
             directory = os.path.dirname(self.filename)
             if directory:  # 只有在有目录部分时才创建
                 os.makedirs(directory, exist_ok=True)
-            self._file = open(self.filename, 'a', encoding='utf-8', buffering=8192)
+            # 二进制追加写入：编码在写入前完成，缓冲区在每批结束时才flush
+            self._file = open(self.filename, 'ab', buffering=_FILE_BUFFER_SIZE)
+            self._bytes_written = os.fstat(self._file.fileno()).st_size
         except IOError as e:
             print(f"无法打开日志文件 {self.filename}: {e}", file=sys.stderr)
     
     def _should_rollover(self) -> bool:
-        """检查文件是否需要轮转"""
-        if self._file is None:
-            return False
-        try:
-            self._file.flush()
-            return os.fstat(self._file.fileno()).st_size >= self.max_bytes
-        except (OSError, IOError):
-            return False
+        """检查文件是否需要轮转（按已写入字节数判断，无需flush和fstat）"""
+        return self._file is not None and self._bytes_written >= self.max_bytes
+    
+    def _write(self, data: bytes) -> None:
+        """写入缓冲区并累计文件大小"""
+        with self._lock:
+            if self._file:
+                self._file.write(data)
+                self._bytes_written += len(data)
     
     def _do_rollover(self):
         """执行日志文件轮转"""
@@ -249,33 +406,51 @@ class FileHandler(LogHandler):
                 self._do_rollover()
             
             if 'message' in record and isinstance(record['message'], str):
-                with self._lock:
-                    if self._file:
-                        self._file.write(record['message'] + '\n')
-                        self._file.flush()  # 添加flush确保数据写入
+                msg = record['message'] + '\n'
             else:
                 msg = self.formatter.format(record) + '\n'
-                with self._lock:
-                    if self._file:
-                        self._file.write(msg)
-                        self._file.flush()  # 添加flush确保数据写入
+            self._write(msg.encode('utf-8'))
         except Exception as e:
             print(f"FileHandler写入失败: {e}", file=sys.stderr)
     
     def _emit_batch(self, messages: List[str]):
-        """批量写入文件"""
-        data = '\n'.join(messages) + '\n'
+        """批量写入文件（刷新由调度器在每批结束时调用flush完成）"""
         try:
             if self._should_rollover():
                 self._do_rollover()
             
-            with self._lock:
-                if self._file:
-                    self._file.write(data)
-                    self._file.flush()  # 添加flush确保数据写入
+            data = ('\n'.join(messages) + '\n').encode('utf-8')
+            if self._bytes_written + len(data) <= self.max_bytes:
+                self._write(data)
+            else:
+                # 本批会越过max_bytes：在达到上限处拆分，保证轮转粒度仍是单条记录
+                self._write_split(messages)
         except Exception as e:
             print(f"FileHandler批量写入失败: {e}", file=sys.stderr)
     
+    def _write_split(self, messages: List[str]) -> None:
+        """逐条累计大小，每当达到max_bytes就写出已累积部分并轮转"""
+        chunk: List[bytes] = []
+        size = self._bytes_written
+        for msg in messages:
+            if size >= self.max_bytes and self._file is not None:
+                if chunk:
+                    self._write(b''.join(chunk))
+                    chunk.clear()
+                self._do_rollover()
+                size = self._bytes_written
+            line = (msg + '\n').encode('utf-8')
+            chunk.append(line)
+            size += len(line)
+        if chunk:
+            self._write(b''.join(chunk))
+    
+    def flush(self) -> None:
+        """将缓冲区写入文件"""
+        with self._lock:
+            if self._file:
+                self._file.flush()
+    
     def close(self):
         """关闭文件处理器"""
         with self._lock:
@@ -321,23 +496,12 @@ class LockFreeFileHandler(FileHandler):
             
             with self._lock:
                 if self._file:
-                    self._file.write(msg)
+                    self._file.write(data)
         except Exception as e:
             print(f"LockFreeFileHandler写入失败: {e}", file=sys.stderr)
 
-    # 同时添加批量写入方法
-    def _emit_batch(self, messages: List[str]):
-        """批量写入支持"""
-        data = '\n'.join(messages) + '\n'
-        try:
-            if self._should_rollover():
-                self._executor.submit(self._do_rollover)
-            
-            with self._lock:
-                if self._file:
-                    self._file.write(data)
-        except Exception as e:
-            print(f"LockFreeFileHandler批量写入失败: {e}", file=sys.stderr)
+    # 批量写入沿用FileHandler._emit_batch：它只在调度器线程上执行，不会阻塞调用方，
+    # 因此轮转同步进行，并在max_bytes处拆分批次（异步轮转赶不上同一批后续的写入）
     
     def close(self):
         super().close()
@@ -352,6 +516,9 @@ class AsyncDispatcher:
     _initialized = False
     
     def __new__(cls):
+        # 已创建时无需加锁（双重检查）
+        if cls._instance is not None:
+            return cls._instance
         with cls._lock:
             if cls._instance is None:
                 cls._instance = super().__new__(cls)
@@ -361,68 +528,168 @@ class AsyncDispatcher:
         if self._initialized:
             return
         
-        self.queue = queue.Queue(maxsize=10000)
+        # MPSC缓冲区，元素为 (record, handlers)：deque.append在GIL下是原子的，生产者之间无需加锁
+        self.queue = deque()
+        self.maxsize = 10000
+        self.batch_size = 500        # 常规批量
+        self.max_batch_size = 4096   # 积压时批量上限
+        self.idle_timeout = 0.5      # 空闲时最长等待（有新日志会立即唤醒）
+        self.block_on_full = False   # 队列满时：False丢弃新日志，True阻塞调用方直到有空位
         self._stop_event = threading.Event()
+        self._wakeup = threading.Event()
+        self._not_full = threading.Event()
+        self._dropped = 0
+        self._dropped_lock = threading.Lock()
+        self._dropped_reported = 0
+        self._last_drop_report = 0.0
         self._worker = threading.Thread(target=self._process_logs, daemon=True)
         self._worker.start()
         self._initialized = True
     
     def _process_logs(self):
-        """后台线程批量处理日志"""
+        """后台线程批量处理日志（单消费者，成批取出）
+        
+        队列积压（取满一批）时批量翻倍直至max_batch_size，跟上后恢复为batch_size；
+        队列为空时阻塞等待生产者唤醒，而不是定时轮询。
+        """
+        buffer = self.queue
+        popleft = buffer.popleft
+        wakeup = self._wakeup
         batch = []
-        last_flush = time.perf_counter()
+        limit = self.batch_size
         
-        while not self._stop_event.is_set():
+        while True:
+            stopping = self._stop_event.is_set()
             try:
-                record = self.queue.get(timeout=0.01)
-                batch.append(record)
-                
-                if (len(batch) >= 500 or 
-                    time.perf_counter() - last_flush > 0.1):
-                    self._flush_batch(batch)
-                    batch.clear()
-                    last_flush = time.perf_counter()
-            except queue.Empty:
+                while buffer and len(batch) < limit:
+                    batch.append(popleft())
                 if batch:
+                    full = len(batch) >= limit
+                    self._not_full.set()  # 已腾出空间，唤醒阻塞的生产者
                     self._flush_batch(batch)
                     batch.clear()
-                    last_flush = time.perf_counter()
+                    limit = min(limit * 2, self.max_batch_size) if full else self.batch_size
+                    if self._dropped != self._dropped_reported:
+                        self._report_dropped()
+                    continue
             except Exception as e:
                 print(f"AsyncDispatcher线程错误: {e}", file=sys.stderr)
                 batch.clear()
-    
-    def _flush_batch(self, batch: List[Dict[str, Any]]):
-        """批量写入 - 修复版（逐个处理，而非批量）"""
-        for record in batch:
-            handlers = record.pop('_handlers', [])
+            
+            # 队列已清空：补报积压末尾的丢弃。空闲等待最长idle_timeout，
+            # 节流窗口过后的下一轮会报出；停止时不受节流限制，保证最后一次报告
+            if self._dropped != self._dropped_reported:
+                self._report_dropped(force=stopping)
+            if stopping:
+                break
+            wakeup.clear()
+            if buffer:  # clear之前入队的日志
+                continue
+            wakeup.wait(self.idle_timeout)
+    
+    def _flush_batch(self, batch: List[tuple]):
+        """批量写入 - 按处理器汇总格式化结果，每个处理器调用一次_emit_batch"""
+        buckets: Dict[LogHandler, List[str]] = {}
+        for record, handlers in batch:
+            # 处理器已在LogBolt._log中按级别筛选过
             for handler in handlers:
-                if record['level'] < handler.level:  # 修复：正确的级别比较
-                    continue
+                messages = buckets.get(handler)
+                if messages is None:
+                    messages = buckets[handler] = []
                 try:
-                    # 逐个格式化并写入（确保每个都执行）
-                    msg = handler.formatter.format(record)
-                    handler.emit({'message': msg})  # 使用emit而不是_emit_batch
+                    messages.append(handler.formatter.format(record))
                 except Exception as e:
-                    print(f"写入失败: {e}, handler={type(handler).__name__}", file=sys.stderr)
-                    continue
+                    print(f"格式化失败: {e}, handler={type(handler).__name__}", file=sys.stderr)
+        
+        # 每个处理器一次写入、一次刷新，而不是每条记录一次
+        for handler, messages in buckets.items():
+            try:
+                if messages:
+                    handler._emit_batch(messages)
+                handler.flush()
+            except Exception as e:
+                print(f"写入失败: {e}, handler={type(handler).__name__}", file=sys.stderr)
+    
+    def _report_dropped(self, force: bool = False):
+        """向stderr报告新增的丢弃数量（每秒最多一次；force时忽略节流）"""
+        now = time.monotonic()
+        if not force and now - self._last_drop_report < 1.0:
+            return
+        dropped = self._dropped
+        print(f"AsyncDispatcher队列已满，丢弃了{dropped - self._dropped_reported}条日志"
+              f"（累计{dropped}条）", file=sys.stderr)
+        self._dropped_reported = dropped
+        self._last_drop_report = now
+    
+    def get_dropped(self) -> int:
+        """返回因队列满而丢弃的日志总数"""
+        return self._dropped
     
     def dispatch(self, record: Dict[str, Any], handlers: List[LogHandler]):
-        """非阻塞派遣日志"""
-        try:
-            record['_handlers'] = handlers
-            self.queue.put_nowait(record)
-        except queue.Full:
-            pass
+        """派遣日志（默认非阻塞；队列满时按block_on_full丢弃或等待）"""
+        if len(self.queue) >= self.maxsize:
+            if not self._wait_not_full():
+                # 只有丢弃路径加锁，正常入队路径不受影响
+                with self._dropped_lock:
+                    self._dropped += 1
+                return
+        # 处理器列表与记录一起入队，不写入记录本身
+        self.queue.append((record, handlers))
+        # 先入队再检查：消费者clear后会重新检查队列，不会漏掉唤醒
+        if not self._wakeup.is_set():
+            self._wakeup.set()
+    
+    def _wait_not_full(self) -> bool:
+        """block_on_full时等待队列出现空位；返回False表示应丢弃该日志"""
+        if not self.block_on_full:
+            return False
+        # 后台线程自身（处理器/格式化器内记录日志）等待会死锁：直接丢弃
+        if threading.current_thread() is self._worker:
+            return False
+        not_full = self._not_full
+        while len(self.queue) >= self.maxsize:
+            # 后台线程已停止时不再等待，避免调用方永久阻塞
+            if self._stop_event.is_set() or not self._worker.is_alive():
+                return False
+            not_full.clear()
+            if len(self.queue) < self.maxsize:
+                break
+            self._wakeup.set()
+            not_full.wait(0.1)
+        return True
     
     def shutdown(self):
         self._stop_event.set()
+        self._wakeup.set()
+        self._not_full.set()
         self._worker.join(timeout=5)
 
 
+class _LogContext:
+    """LogBolt.context()返回的上下文管理器 - 无生成器开销"""
+    
+    __slots__ = ('logger', 'ctx', 'old')
+    
+    def __init__(self, logger: 'LogBolt', ctx: Dict[str, Any]):
+        self.logger = logger
+        self.ctx = ctx
+        self.old: Optional[Dict[str, Any]] = None
+    
+    def __enter__(self) -> None:
+        logger = self.logger
+        self.old = logger._context
+        logger._context = {**self.old, **self.ctx}
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.logger._context = self.old
+
+
 class LogBolt:
     """主日志类 - 高性能日志记录"""
     
-    __slots__ = ('name', 'level', 'handlers', '_context', '_filter_chain', '_filters')
+    __slots__ = ('name', 'level', 'handlers', '_context', '_filter_fns', '_filters',
+                 '_dispatcher', '_min_handler_level', '_levels_epoch', '_handlers_by_level',
+                 '_levels_handlers', '_levels_count')
     
     def __init__(self, name: str = "LogBolt"):
         self.name = name
@@ -430,7 +697,14 @@ class LogBolt:
         self.handlers: List[LogHandler] = []
         self._context: Dict[str, Any] = {}
         self._filters: List[Filter] = []
-        self._filter_chain: Callable = lambda r: r
+        self._filter_fns: tuple = ()
+        self._dispatcher = AsyncDispatcher()  # 单例，创建时取一次，避免每条日志查找
+        self._min_handler_level: float = 0
+        self._handlers_by_level: Dict[int, tuple] = {}
+        self._levels_epoch = -1  # 与_handler_epoch不一致时重新计算处理器级别
+        # 计算缓存时的handlers列表及其长度：直接修改或替换logger.handlers也会使缓存失效
+        self._levels_handlers: Optional[List[LogHandler]] = None
+        self._levels_count = 0
     
     def set_level(self, level: LogLevel):
         """设置全局日志级别"""
@@ -439,11 +713,33 @@ class LogBolt:
     def add_handler(self, handler: LogHandler):
         """添加日志处理器"""
         self.handlers.append(handler)
+        self._levels_epoch = -1
     
     def remove_handler(self, handler: LogHandler):
         """移除日志处理器"""
         if handler in self.handlers:
             self.handlers.remove(handler)
+        self._levels_epoch = -1
+    
+    def _refresh_handler_levels(self):
+        """重新计算处理器的最低级别，并为每个级别预先筛选出接收它的处理器
+        
+        没有处理器时任何级别都不会被记录。
+        先算好两张表再写入，缓存有效性标记（epoch/列表/长度）最后写：
+        并发的_log只要看到新标记，读到的就一定是新表。
+        """
+        epoch = _handler_epoch
+        handlers = self.handlers
+        snapshot = tuple(handlers)
+        min_level = min((h.level for h in snapshot), default=float('inf'))
+        by_level = {
+            level: tuple(h for h in snapshot if level >= h.level) for level in _LEVEL_NAMES
+        }
+        self._min_handler_level = min_level
+        self._handlers_by_level = by_level
+        self._levels_handlers = handlers
+        self._levels_count = len(snapshot)
+        self._levels_epoch = epoch
     
     def add_filter(self, filter: Filter):
         """添加过滤器"""
@@ -451,21 +747,12 @@ class LogBolt:
         self._rebuild_filter_chain()
     
     def _rebuild_filter_chain(self):
-        """构建优化的过滤器执行链"""
-        chain = lambda r: r
-        for f in reversed(self._filters):
-            chain = lambda r, f=f, prev=chain: prev(r) if f.filter(r) else None
-        self._filter_chain = chain
-    
-    @contextlib.contextmanager
-    def context(self, **ctx):
+        """构建过滤器执行链：按添加顺序排列的filter方法元组"""
+        self._filter_fns = tuple(f.filter for f in self._filters)
+    
+    def context(self, **ctx) -> '_LogContext':
         """MDC上下文管理器"""
-        old_context = self._context.copy()
-        self._context.update(ctx)
-        try:
-            yield
-        finally:
-            self._context = old_context
+        return _LogContext(self, ctx)
     
     def bind(self, **ctx) -> 'LogBolt':
         """返回绑定新上下文的Logger（Fluent API）"""
@@ -473,7 +760,7 @@ class LogBolt:
         new_logger.level = self.level
         new_logger.handlers = self.handlers[:]
         new_logger._filters = self._filters[:]
-        new_logger._filter_chain = self._filter_chain
+        new_logger._filter_fns = self._filter_fns
         new_logger._context = {**self._context, **ctx}
         return new_logger
     
@@ -485,7 +772,7 @@ class LogBolt:
             'message': msg,
             'timestamp': time.time_ns(),
             'thread_id': threading.get_ident(),
-            'process_id': os.getpid(),
+            'process_id': _PID,
         }
         if self._context:
             record.update(self._context)
@@ -493,41 +780,88 @@ class LogBolt:
             record.update(kwargs)
         return record
     
-    def _log(self, level: LogLevel, msg: str, **kwargs) -> None:
-        """内部日志方法 - 快速路径"""
+    def _log(self, level: LogLevel, msg: str, args: tuple, kwargs: Dict[str, Any]) -> None:
+        """内部日志方法 - 快速路径
+        
+        args/kwargs按原样传入，不再经过*/**二次打包；kwargs只会被读取（合并进
+        新记录），因此调用方可以复用同一个字典。
+        带位置参数时按 msg % args 插值，且只在通过级别检查后进行；
+        插值失败时向stderr报告并丢弃该条日志，不向调用方抛出异常。
+        """
         if level < self.level:
             return
         
+        # 所有处理器都不接收该级别时，在读时间、构建记录之前就返回
+        current = self.handlers
+        if (self._levels_epoch != _handler_epoch or current is not self._levels_handlers
+                or len(current) != self._levels_count):
+            self._refresh_handler_levels()
+        if level < self._min_handler_level:
+            return
+        
+        # 只派遣给接收该级别的处理器（非标准级别数值时现场筛选）
+        handlers = self._handlers_by_level.get(level)
+        if handlers is None:
+            handlers = tuple(h for h in current if level >= h.level)
+        if not handlers:
+            return
+        
+        if args:
+            # 与标准库logging一致：唯一的位置参数为非空映射时按 %(key)s 插值
+            if len(args) == 1 and isinstance(args[0], Mapping) and args[0]:
+                args = args[0]
+            try:
+                msg = msg % args
+            except Exception as e:
+                print(f"日志消息插值失败: {e}, msg={msg!r}, args={args!r}", file=sys.stderr)
+                return
+        
         record = self._build_record(level, msg, kwargs)
         
         # 应用过滤器链
-        if self._filter_chain(record) is None:
-            return
+        for fn in self._filter_fns:
+            if not fn(record):
+                return
         
         # 异步派遣
-        dispatcher = AsyncDispatcher()
-        dispatcher.dispatch(record, self.handlers)
+        self._dispatcher.dispatch(record, handlers)
+    
+    def debug(self, msg: str, *args, **kwargs):
+        self._log(LogLevel.DEBUG, msg, args, kwargs)
     
-    def debug(self, msg: str, **kwargs):
-        self._log(LogLevel.DEBUG, msg, **kwargs)
+    def info(self, msg: str, *args, **kwargs):
+        self._log(LogLevel.INFO, msg, args, kwargs)
     
-    def info(self, msg: str, **kwargs):
-        self._log(LogLevel.INFO, msg, **kwargs)
+    def warning(self, msg: str, *args, **kwargs):
+        self._log(LogLevel.WARNING, msg, args, kwargs)
     
-    def warning(self, msg: str, **kwargs):
-        self._log(LogLevel.WARNING, msg, **kwargs)
+    def error(self, msg: str, *args, **kwargs):
+        self._log(LogLevel.ERROR, msg, args, kwargs)
     
-    def error(self, msg: str, **kwargs):
-        self._log(LogLevel.ERROR, msg, **kwargs)
+    def critical(self, msg: str, *args, **kwargs):
+        self._log(LogLevel.CRITICAL, msg, args, kwargs)
     
-    def critical(self, msg: str, **kwargs):
-        self._log(LogLevel.CRITICAL, msg, **kwargs)
+    def make_fast_emitter(self, level: LogLevel,
+                          extras: Optional[Dict[str, Any]] = None) -> Callable[[str], None]:
+        """返回绑定到固定级别的记录函数 - 供热循环使用
+        
+        级别检查在调用_log之前完成，被禁用的级别不会进入日志管线；
+        extras为每条记录附带的固定字段，只在此处构建一次并按引用使用，
+        避免每次调用创建kwargs字典（之后不要再修改该字典）。
+        """
+        log = self._log
+        fields = extras if extras is not None else {}
+        
+        def emit(msg: str) -> None:
+            if level >= self.level:
+                log(level, msg, (), fields)
+        
+        return emit
     
     def close(self):
         """关闭所有处理器（修复：等待异步完成）"""
         # 先关闭调度器，等待剩余日志处理
-        dispatcher = AsyncDispatcher()
-        dispatcher.shutdown()  # 等待最多5秒
+        self._dispatcher.shutdown()  # 等待最多5秒
         
         # 再关闭各个处理器
         for handler in self.handlers:
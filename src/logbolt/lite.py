@@ -22,6 +22,10 @@ time_cache_lock = threading.Lock()
 file_handles = {}
 file_handles_lock = threading.Lock()
 
+# 缓冲区累积到该大小时自动写出一次
+FLUSH_BYTES = 1048576
+BATCH_FLUSH_BYTES = 10485760  # 批量缓冲区上限（10MB）
+
 # 日志级别常量 - 避免枚举查找
 DEBUG = 10
 INFO = 20
@@ -50,15 +54,17 @@ class UltraFastLogger:
     5. 线程不安全，需要外部同步
     """
     
-    __slots__ = ('name', 'level', 'filename', '_file', '_buffer', '_buffer_pos')
+    __slots__ = ('name', 'level', 'filename', '_file', '_buffer',
+                 '_prefix_sec', '_prefixes')
     
     def __init__(self, name: bytes, level: int = INFO, filename: Optional[bytes] = None):
         self.name = name
         self.level = level
         self.filename = filename
         self._file = None
-        self._buffer = bytearray(1048576)  # 1MB缓冲区
-        self._buffer_pos = 0
+        self._buffer = bytearray()  # 累积到FLUSH_BYTES后写出
+        self._prefix_sec = -1
+        self._prefixes: Dict[int, bytes] = {}
         
         if filename:
             self._open_file()
@@ -73,9 +79,10 @@ class UltraFastLogger:
             
             self._file = open(self.filename.decode(), 'ab', buffering=0)  # 无缓冲
     
-    def _get_time_bytes(self) -> bytes:
+    def _get_time_bytes(self, current_time: Optional[int] = None) -> bytes:
         """获取缓存的时间字节 - 每秒更新一次"""
-        current_time = int(time.time())
+        if current_time is None:
+            current_time = int(time.time())
         
         if current_time not in time_cache:
             with time_cache_lock:
@@ -91,13 +98,23 @@ class UltraFastLogger:
         
         return time_cache[current_time]
     
-    def _format_message(self, level: int, msg: bytes) -> bytes:
-        """格式化消息 - 零分配"""
-        time_bytes = self._get_time_bytes()
-        level_name = LEVEL_NAMES[level]
+    def _get_prefix(self, level: int) -> bytes:
+        """获取缓存的 b'时间 [级别] ' 前缀 - 每秒每个级别只拼接一次"""
+        current_time = int(time.time())
+        if current_time != self._prefix_sec:
+            self._prefix_sec = current_time
+            self._prefixes = {}
         
-        # 手动构建消息 - 避免复杂的缓冲区操作
-        return time_bytes + b' [' + level_name + b'] ' + msg + b'\n'
+        prefix = self._prefixes.get(level)
+        if prefix is None:
+            prefix = (self._get_time_bytes(current_time) + b' [' +
+                      LEVEL_NAMES[level] + b'] ')
+            self._prefixes[level] = prefix
+        return prefix
+    
+    def _format_message(self, level: int, msg: bytes) -> bytes:
+        """格式化消息 - 前缀已缓存，只需一次拼接"""
+        return self._get_prefix(level) + msg + b'\n'
     
     def log_raw(self, level: int, formatted_msg: bytes) -> None:
         """
@@ -122,15 +139,11 @@ class UltraFastLogger:
         if level < self.level:
             return
         
-        formatted = self._format_message(level, msg)
-        
-        # 添加到缓冲区
-        msg_len = len(formatted)
-        if self._buffer_pos + msg_len > len(self._buffer):
+        # 追加到缓冲区，攒够FLUSH_BYTES才触发一次write
+        buf = self._buffer
+        buf += self._format_message(level, msg)
+        if len(buf) >= FLUSH_BYTES:
             self.flush()
-        
-        self._buffer[self._buffer_pos:self._buffer_pos+msg_len] = formatted
-        self._buffer_pos += msg_len
     
     def log_direct(self, level: int, msg: bytes) -> None:
         """
@@ -150,10 +163,10 @@ class UltraFastLogger:
     
     def flush(self) -> None:
         """刷新缓冲区 - 必须手动调用"""
-        if self._file and self._buffer_pos > 0:
-            self._file.write(bytes(self._buffer[:self._buffer_pos]))
-            self._file.flush()
-            self._buffer_pos = 0
+        if self._buffer:
+            if self._file:
+                self._file.write(self._buffer)
+            self._buffer.clear()
     
     def close(self) -> None:
         """关闭日志器"""
@@ -170,40 +183,30 @@ class BatchLogger:
     使用方法极其复杂，但性能极高
     """
     
-    __slots__ = ('logger', 'batch_buffer', 'batch_count')
+    __slots__ = ('logger', '_buf')
     
     def __init__(self, logger: UltraFastLogger):
         self.logger = logger
-        self.batch_buffer = bytearray(10485760)  # 10MB批量缓冲区
-        self.batch_count = 0
+        self._buf = bytearray()  # 所有日志行连续存放，flush时一次write
     
     def add_log(self, level: int, msg: bytes) -> None:
-        """添加日志到批量 - 零分配"""
+        """添加日志到批量 - 直接追加到扁平缓冲区"""
         if level < self.logger.level:
             return
         
-        time_bytes = self.logger._get_time_bytes()
-        level_name = LEVEL_NAMES[level]
-        
-        # 格式化并添加到批量缓冲区
-        log_line = time_bytes + b' [' + level_name + b'] ' + msg + b'\n'
-        
-        current_pos = len(self.batch_buffer) - (self.batch_count * len(log_line))
-        if current_pos < 0:
+        buf = self._buf
+        buf += self.logger._get_prefix(level)
+        buf += msg
+        buf.append(0x0A)
+        if len(buf) >= BATCH_FLUSH_BYTES:
             self.flush()
-            current_pos = len(self.batch_buffer) - len(log_line)
-        
-        start_pos = current_pos - len(log_line)
-        self.batch_buffer[start_pos:current_pos] = log_line
-        self.batch_count += 1
     
     def flush(self) -> None:
-        """刷新批量"""
-        if self.batch_count > 0 and self.logger._file:
-            total_size = self.batch_count * (len(self.batch_buffer) // self.batch_count)
-            self.logger._file.write(bytes(self.batch_buffer[-total_size:]))
-            self.logger._file.flush()
-            self.batch_count = 0
+        """刷新批量 - 整个缓冲区一次write"""
+        if self._buf:
+            if self.logger._file:
+                self.logger._file.write(self._buf)
+            self._buf.clear()
 
 
 # 全局单例 - 避免重复创建
@@ -230,7 +233,7 @@ class StaticFormatter:
     警告：使用方法极其复杂，需要预分配所有缓冲区
     """
     
-    __slots__ = ('template', 'field_positions', 'field_lengths')
+    __slots__ = ('template', 'field_positions', 'field_lengths', '_parts')
     
     def __init__(self, template: bytes):
         self.template = template
@@ -246,60 +249,27 @@ class StaticFormatter:
                 pos += 2
             else:
                 pos += 1
+        
+        # 占位符之间的常量片段，格式化时与参数交错拼接
+        self._parts = template.split(b'{}')
     
     def format_static(self, *args: bytes) -> bytes:
         """
-        静态格式化 - 零分配
+        静态格式化 - 一次join完成拼接
         
         警告：
         1. 参数必须严格匹配模板中的占位符数量
         2. 所有参数必须是bytes类型
-        3. 返回值是临时缓冲区，必须立即使用
+        3. 每次调用返回新的bytes对象
         """
         if len(args) != len(self.field_positions):
             raise ValueError("参数数量不匹配")
         
-        # 计算总长度
-        total_len = len(self.template)
-        for arg in args:
-            total_len += len(arg) - 2  # -2 for {}
-        
-        # 使用线程本地缓冲区
-        if not hasattr(thread_local, 'format_buffer'):
-            thread_local.format_buffer = bytearray(8192)
-        
-        buf = thread_local.format_buffer
-        if total_len > len(buf):
-            raise BufferError("消息太大")
-        
-        # 手动构建结果
-        result_pos = 0
-        template_pos = 0
-        
-        for i, field_pos in enumerate(self.field_positions):
-            # 复制模板字段前的部分
-            copy_len = field_pos - template_pos
-            buf[result_pos:result_pos+copy_len] = self.template[template_pos:field_pos]
-            result_pos += copy_len
-            
-            # 复制参数
-            arg = args[i]
-            buf[result_pos:result_pos+len(arg)] = arg
-            result_pos += len(arg)
-            
-            template_pos = field_pos + self.field_lengths[i]
-        
-        # 复制剩余部分
-        remaining_len = len(self.template) - template_pos
-        if remaining_len > 0:
-            buf[result_pos:result_pos+remaining_len] = self.template[template_pos:]
-            result_pos += remaining_len
-        
-        return bytes(buf[:result_pos])
-
-
-# 线程本地存储
-thread_local = threading.local()
+        # 常量片段放在偶数位、参数放在奇数位，由一次join完成拼接
+        pieces = [None] * (2 * len(args) + 1)
+        pieces[0::2] = self._parts
+        pieces[1::2] = args
+        return b''.join(pieces)
 
 
 # 极速日志函数 - 最难用但最快